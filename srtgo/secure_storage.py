@@ -1,99 +1,459 @@
 """
 SRTgo 설정 암호화 저장소 모듈 (keyring 대체용)
 """
+import ctypes
+import ctypes.util
 import getpass
 import hashlib
+import hmac
 import json
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from Crypto.Cipher import AES
+import zstandard
+from argon2.low_level import Type, hash_secret_raw
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 모듈 사용
+    orjson = None
 
 # 설정 파일 경로
 CONFIG_DIR = Path.home() / '.srtgo'
 CONFIG_FILE = CONFIG_DIR / 'config.encrypted'
-KEY_FILE = CONFIG_DIR / '.key'  # 암호화 키 해시를 저장하는 파일
+CONFIG_TMP_FILE = CONFIG_FILE.with_suffix('.encrypted.tmp')  # 원자적 저장용 임시 파일
+KEY_FILE = CONFIG_DIR / '.key'  # 이전 버전의 키 해시 파일 (설정 파일 헤더로 변환 후 삭제)
+SEALED_KEY_FILE = CONFIG_DIR / '.sealed'  # DPAPI로 봉인된 암호화 키 (Windows)
+
+# OS 보안 저장소에 암호화 키를 보관할 때 사용하는 이름
+SEALED_KEY_NAME = 'srtgo-encryption-key'
+KEY_SPEC_SESSION_KEYRING = -3
+CRYPTPROTECT_UI_FORBIDDEN = 0x1
+
+# 설정 파일 헤더: magic(4) + 버전(1) + KDF 헤더 길이(1) + KDF 헤더 + 검증 태그(16) + AEAD 알고리즘(1)
+CONFIG_MAGIC = b'SRTG'
+CONFIG_VERSION = 1
+VERIFY_TAG_SIZE = 16
+VERIFY_MESSAGE = b'srtgo-verify'
+
+# 키 유도 함수 설정 (새로 설정하는 키는 Argon2id, KDF 헤더가 없으면 PBKDF2)
+ARGON2_HEADER = b'argon2id\x00'
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 65536  # KiB
+ARGON2_PARALLELISM = 1
+SALT_SIZE = 16
+PBKDF2_SALT = b'srtgo-salt'
+PBKDF2_ITERATIONS = 100000
+
+# AEAD 알고리즘 태그
+AEAD_AES_GCM = 0x01
+AEAD_CHACHA20 = 0x02
+AEAD_CLASSES = {AEAD_AES_GCM: AESGCM, AEAD_CHACHA20: ChaCha20Poly1305}
+
+# 압축된 평문 앞에 붙는 표시 (JSON 평문은 항상 '{'로 시작)
+COMPRESSED_FLAG = b'Z'
+COMPRESS_MIN_SIZE = 512  # 이보다 작은 설정은 압축 이득이 없음
+ZSTD_LEVEL = 3
+
+O_BINARY = getattr(os, 'O_BINARY', 0)  # Windows에서 텍스트 모드 변환 방지
+
+NONCE_SIZE = 12  # AES-GCM/ChaCha20-Poly1305 nonce 길이
+LEGACY_NONCE_SIZE = 16  # 이전 버전(PyCryptodome) 파일의 nonce 길이
 
 # 기본 설정
 DEFAULT_CONFIG = {}
 ENCODING = 'utf-8'
 
+_config_dir_ready = False  # 설정 디렉토리 생성 확인 여부
+
+_zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+# --- OS 보안 저장소 (암호화 키 봉인) ---
+def _keyutils():
+    """libkeyutils 로드 (Linux 커널 키링), 없으면 None"""
+    path = ctypes.util.find_library('keyutils')
+    if not path:
+        return None
+    lib = ctypes.CDLL(path)
+    lib.add_key.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int32]
+    lib.add_key.restype = ctypes.c_int32
+    lib.request_key.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int32]
+    lib.request_key.restype = ctypes.c_int32
+    lib.keyctl_read_alloc.argtypes = [ctypes.c_int32, ctypes.POINTER(ctypes.c_void_p)]
+    lib.keyctl_read_alloc.restype = ctypes.c_long
+    return lib
+
+def _keyring_load():
+    lib = _keyutils()
+    if lib is None:
+        return None
+    serial = lib.request_key(b'user', SEALED_KEY_NAME.encode(), None, 0)
+    if serial < 0:
+        return None
+    buf = ctypes.c_void_p()
+    size = lib.keyctl_read_alloc(serial, ctypes.byref(buf))
+    if size < 0:
+        return None
+    try:
+        return ctypes.string_at(buf, size)
+    finally:
+        ctypes.CDLL(None).free(buf)
+
+def _keyring_store(key):
+    lib = _keyutils()
+    if lib is None:
+        return False
+    serial = lib.add_key(b'user', SEALED_KEY_NAME.encode(), key, len(key), KEY_SPEC_SESSION_KEYRING)
+    return serial >= 0
+
+def _keychain_load():
+    result = subprocess.run(
+        ['security', 'find-generic-password', '-a', getpass.getuser(), '-s', SEALED_KEY_NAME, '-w'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return bytes.fromhex(result.stdout.strip())
+
+def _keychain_store(key):
+    # 키가 ps 등으로 노출되지 않도록 명령줄 인자 대신 대화형 모드(-i)의 stdin으로 전달
+    command = f'add-generic-password -U -a "{getpass.getuser()}" -s {SEALED_KEY_NAME} -w {key.hex()}\n'
+    result = subprocess.run(['security', '-i'], input=command, capture_output=True, text=True)
+    return result.returncode == 0 and not result.stderr.strip()
+
+def _has_aes_acceleration():
+    """CPU가 AES 명령어(AES-NI, ARMv8 Crypto)를 지원하는지 확인 (알 수 없으면 True)"""
+    if not sys.platform.startswith('linux'):
+        return True
+    try:
+        with open('/proc/cpuinfo', encoding=ENCODING) as f:
+            for line in f:
+                if line.startswith(('flags', 'Features')):
+                    return 'aes' in line.partition(':')[2].split()
+    except OSError:
+        pass
+    return True
+
+# AES 가속이 없는 CPU에서는 소프트웨어로도 빠른 ChaCha20-Poly1305 사용
+DEFAULT_AEAD = AEAD_AES_GCM if _has_aes_acceleration() else AEAD_CHACHA20
+
+def _read_file(path):
+    """버퍼 없이 파일 전체를 한 번에 읽기"""
+    fd = os.open(path, os.O_RDONLY | O_BINARY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+def _write_file(path, data):
+    """버퍼 없이 파일을 쓰고 fsync"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | O_BINARY, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _dumps(config):
+    """설정을 JSON bytes로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(config)
+    return json.dumps(config, ensure_ascii=False, separators=(',', ':')).encode(ENCODING)
+
+def _loads(data):
+    """JSON bytes를 설정으로 역직렬화"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode(ENCODING))
+
+def _compress(data):
+    """JSON 평문을 zstd로 압축 (이득이 없으면 그대로 반환)"""
+    if len(data) < COMPRESS_MIN_SIZE:
+        return data
+    compressed = COMPRESSED_FLAG + _zstd_compressor.compress(data)
+    return compressed if len(compressed) < len(data) else data
+
+def _decompress(data):
+    """압축 표시가 있으면 zstd 압축 해제"""
+    if data.startswith(COMPRESSED_FLAG):
+        return _zstd_decompressor.decompress(data[len(COMPRESSED_FLAG):])
+    return data
+
+def _encode_kdf_header(params):
+    """Argon2id 파라미터를 KDF 헤더로 변환"""
+    options = f"t={params['t']},m={params['m']},p={params['p']}".encode(ENCODING)
+    return ARGON2_HEADER + options + b'\x00' + params['salt']
+
+def _decode_kdf_header(data):
+    """KDF 헤더를 Argon2id 파라미터로 변환 (PBKDF2이면 None)"""
+    if not data.startswith(ARGON2_HEADER):
+        return None
+    
+    options, _, rest = data[len(ARGON2_HEADER):].partition(b'\x00')
+    params = {k: int(v) for k, v in (item.split('=') for item in options.decode(ENCODING).split(','))}
+    params['salt'] = rest[:SALT_SIZE]
+    return params
+
+def _parse_header(data):
+    """설정 파일 헤더 파싱 (KDF 파라미터, 검증 태그, AEAD 알고리즘, 헤더 길이), 헤더가 없으면 None
+    
+    헤더가 잘렸거나 손상되었거나 모르는 버전이면 ValueError
+    """
+    if not data.startswith(CONFIG_MAGIC):
+        return None
+    
+    try:
+        pos = len(CONFIG_MAGIC)
+        version = data[pos]
+        if version != CONFIG_VERSION:
+            raise ValueError(f"지원하지 않는 설정 파일 버전입니다: {version}")
+        kdf_size = data[pos + 1]
+        pos += 2
+        kdf_params = _decode_kdf_header(data[pos:pos + kdf_size])
+        pos += kdf_size
+        verify_tag = data[pos:pos + VERIFY_TAG_SIZE]
+        pos += VERIFY_TAG_SIZE
+        algorithm = data[pos]
+    except IndexError:
+        raise ValueError("설정 파일 헤더가 잘렸습니다") from None
+    
+    if algorithm not in AEAD_CLASSES:
+        raise ValueError(f"알 수 없는 암호화 알고리즘입니다: {algorithm}")
+    return kdf_params, verify_tag, algorithm, pos + 1
+
+def _make_verify_tag(key):
+    """비밀번호 검증용 태그 계산"""
+    return hmac.new(key, VERIFY_MESSAGE, hashlib.sha256).digest()[:VERIFY_TAG_SIZE]
+
+class _DataBlob(ctypes.Structure):
+    _fields_ = [('cbData', ctypes.c_uint32), ('pbData', ctypes.POINTER(ctypes.c_char))]
+
+def _dpapi(func, data):
+    """CryptProtectData/CryptUnprotectData 호출"""
+    buf = ctypes.create_string_buffer(data, len(data))
+    blob_in = _DataBlob(len(data), ctypes.cast(buf, ctypes.POINTER(ctypes.c_char)))
+    blob_out = _DataBlob()
+    if not func(ctypes.byref(blob_in), None, None, None, None, CRYPTPROTECT_UI_FORBIDDEN, ctypes.byref(blob_out)):
+        return None
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+def _dpapi_load():
+    if not SEALED_KEY_FILE.exists():
+        return None
+    with open(SEALED_KEY_FILE, 'rb') as f:
+        sealed = f.read()
+    return _dpapi(ctypes.windll.crypt32.CryptUnprotectData, sealed)
+
+def _dpapi_store(key):
+    sealed = _dpapi(ctypes.windll.crypt32.CryptProtectData, key)
+    if sealed is None:
+        return False
+    with open(SEALED_KEY_FILE, 'wb') as f:
+        f.write(sealed)
+    return True
+
+if sys.platform.startswith('linux'):
+    _SEALED_BACKEND = (_keyring_load, _keyring_store)
+elif sys.platform == 'darwin':
+    _SEALED_BACKEND = (_keychain_load, _keychain_store)
+elif sys.platform == 'win32':
+    _SEALED_BACKEND = (_dpapi_load, _dpapi_store)
+else:
+    _SEALED_BACKEND = None
+
+
 class SecureStorage:
     def __init__(self, master_password=None):
         """보안 저장소 초기화"""
         self.ensure_config_dir()
-        self.master_password = master_password
         self.encryption_key = None
-        self.config = DEFAULT_CONFIG.copy()
+        self._aeads = {}  # 알고리즘별 AEAD 객체 (키가 바뀌면 비움)
+        self._kdf_params = None  # None이면 이전 방식(PBKDF2)
+        self._verify_tag = None
+        self._legacy_key_file = False  # 이전 형식(.key 파일 분리) 여부
+        self._legacy_key_hash = None  # 이전 키 파일의 SHA-256 해시
+        self.config = None  # 처음 접근할 때 load()
+        self._dirty = False  # 마지막 저장 이후 변경 여부
+        self._last_bytes_hash = None  # 마지막으로 저장/로드한 평문의 해시
+        self._in_batch = False  # batch() 블록 안에서는 저장을 미룸
+        self._initial_data = None  # 시작 시 헤더 확인용으로 읽은 설정 파일 (첫 load()에서 재사용)
+        self._unreadable = False  # 설정 파일이 있지만 읽거나 해석할 수 없음
         
-        # 키 파일이 존재하면 암호화 키 복원 시도
+        # 설정 파일이 존재하면 암호화 키 복원 시도
         if self._is_initialized():
-            if master_password:
+            if self._unreadable:
+                # 키 없이 시작하여 기존 설정 파일을 덮어쓰지 않음
+                print(f"기존 설정을 보호하기 위해 저장하지 않습니다. 새로 설정하려면 {CONFIG_FILE} 파일을 삭제하세요.")
+            elif master_password:
                 # 사용자가 직접 비밀번호를 제공한 경우
                 self._setup_encryption_key(master_password)
             else:
                 # 저장된 키를 사용 시도
                 self._try_load_key()
+            
+            # 이전 형식이면 .key 파일을 설정 파일 헤더로 합침
+            if self._legacy_key_file and self._verify_key():
+                self._migrate_key_file()
         else:
             # 초기 설정
             self._initial_setup(master_password)
     
     def ensure_config_dir(self):
-        """설정 디렉토리가 존재하는지 확인하고 없으면 생성"""
-        if not CONFIG_DIR.exists():
-            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        """설정 디렉토리가 존재하는지 확인하고 없으면 생성 (프로세스당 한 번)"""
+        global _config_dir_ready
+        if _config_dir_ready:
+            return
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _config_dir_ready = True
     
     def _is_initialized(self):
-        """저장소가 이미 초기화되었는지 확인"""
-        return CONFIG_FILE.exists() and KEY_FILE.exists()
+        """저장소가 이미 초기화되었는지 확인하고 KDF 파라미터/검증 태그 로드
+        
+        설정 파일이 있으면 읽을 수 없더라도 초기화된 것으로 보고 _unreadable 표시
+        """
+        if not CONFIG_FILE.exists():
+            return False
+        
+        try:
+            header = self._read_header()
+        except (OSError, ValueError) as e:
+            print(f"설정 파일을 읽을 수 없습니다: {e}")
+            self._unreadable = True
+            return True
+        
+        if header is not None:
+            self._kdf_params, self._verify_tag = header[0], header[1]
+        elif KEY_FILE.exists():
+            self._legacy_key_file = True
+            self._read_key_file()
+        else:
+            print("설정 파일의 형식을 알 수 없습니다.")
+            self._unreadable = True
+        return True
+    
+    def _read_header(self):
+        """설정 파일 헤더 읽기 (읽은 내용은 첫 load()에서 다시 읽지 않도록 보관)"""
+        data = _read_file(CONFIG_FILE)
+        header = _parse_header(data)
+        if header is not None:
+            self._initial_data = data
+        return header
+    
+    def _read_key_file(self):
+        """이전 키 파일에서 키 해시(SHA-256 hex) 읽기 (이전 버전은 항상 PBKDF2)"""
+        try:
+            self._legacy_key_hash = bytes.fromhex(_read_file(KEY_FILE).decode(ENCODING).strip())
+        except (OSError, ValueError):
+            self._legacy_key_hash = None
     
     def _derive_key(self, password):
         """비밀번호에서 암호화 키 유도"""
         if not password:
             return None
-        return hashlib.pbkdf2_hmac(
-            'sha256', 
-            password.encode(ENCODING), 
-            b'srtgo-salt', 
-            100000
+        
+        secret = password.encode(ENCODING)
+        params = self._kdf_params
+        if params:
+            return hash_secret_raw(
+                secret,
+                params['salt'],
+                time_cost=params['t'],
+                memory_cost=params['m'],
+                parallelism=params['p'],
+                hash_len=32,
+                type=Type.ID
+            )
+        
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=PBKDF2_SALT,
+            iterations=PBKDF2_ITERATIONS
         )
+        return kdf.derive(secret)
     
     def _setup_encryption_key(self, password):
         """암호화 키 설정"""
-        self.encryption_key = self._derive_key(password)
+        self._set_encryption_key(self._derive_key(password))
     
-    def _save_key_hash(self):
-        """키 파일에 암호화 키의 해시값 저장"""
-        if not self.encryption_key:
-            return False
-        
-        key_hash = hashlib.sha256(self.encryption_key).hexdigest()
-        with open(KEY_FILE, 'w', encoding=ENCODING) as f:
-            f.write(key_hash)
-        return True
+    def _set_encryption_key(self, key):
+        """암호화 키 교체 (이전 키는 0으로 덮어쓰고 AEAD 객체는 폐기)"""
+        self._wipe_key()
+        self.encryption_key = bytearray(key) if key else None
+    
+    def _wipe_key(self):
+        """메모리의 암호화 키를 0으로 덮어쓰기"""
+        if self.encryption_key:
+            self.encryption_key[:] = bytes(len(self.encryption_key))
+        self.encryption_key = None
+        self._aeads.clear()
+    
+    def _get_aead(self, algorithm):
+        """알고리즘별 AEAD 객체를 한 번만 생성하여 재사용"""
+        aead = self._aeads.get(algorithm)
+        if aead is None:
+            aead = self._aeads[algorithm] = AEAD_CLASSES[algorithm](self.encryption_key)
+        return aead
     
     def _verify_key(self):
         """현재 암호화 키가 올바른지 검증"""
         if not self.encryption_key:
             return False
+        if self._legacy_key_file:
+            return self._verify_legacy_key()
+        return hmac.compare_digest(_make_verify_tag(self.encryption_key), self._verify_tag)
+    
+    def _verify_legacy_key(self):
+        """이전 키 파일의 해시값으로 암호화 키 검증"""
+        if self._legacy_key_hash is None:
+            return False
         
+        return hmac.compare_digest(hashlib.sha256(self.encryption_key).digest(), self._legacy_key_hash)
+    
+    def _load_sealed_key(self):
+        """OS 보안 저장소에 봉인된 암호화 키 복원 (PBKDF2 생략)"""
+        if _SEALED_BACKEND is None:
+            return False
         try:
-            with open(KEY_FILE, 'r', encoding=ENCODING) as f:
-                stored_hash = f.read().strip()
-            
-            current_hash = hashlib.sha256(self.encryption_key).hexdigest()
-            return stored_hash == current_hash
-        except:
+            key = _SEALED_BACKEND[0]()
+        except Exception:
             return False
-    
-    def _try_load_key(self):
-        """기존 키 파일에서 암호화 키 해시 확인"""
-        if not KEY_FILE.exists():
+        if not key:
             return False
         
-        # 키 파일이 존재하면 마지막으로 사용한 비밀번호 사용 시도
-        if hasattr(self, '_last_password') and self._last_password:
-            self._setup_encryption_key(self._last_password)
-            if self._verify_key():
-                return True
+        self._set_encryption_key(key)
+        if self._verify_key():
+            return True
+        self._set_encryption_key(None)
+        return False
+    
+    def _store_sealed_key(self):
+        """현재 암호화 키를 OS 보안 저장소에 봉인하여 저장"""
+        if _SEALED_BACKEND is None or not self.encryption_key:
+            return False
+        try:
+            return _SEALED_BACKEND[1](bytes(self.encryption_key))
+        except Exception:
+            return False
+    
+    def _try_load_key(self):
+        """저장된 암호화 키 복원 또는 비밀번호 확인"""
+        # 봉인된 키가 있으면 비밀번호 입력 없이 사용
+        if self._load_sealed_key():
+            return True
         
         # 비밀번호 입력 요청
         for _ in range(3):  # 최대 3번 시도
@@ -103,14 +463,16 @@ class SecureStorage:
                 
             self._setup_encryption_key(password)
             if self._verify_key():
-                # 성공한 비밀번호를 저장
-                self._last_password = password
+                # 다음 실행부터 비밀번호 입력 없이 사용
+                self._store_sealed_key()
                 return True
             
             print("비밀번호가 맞지 않습니다. 다시 시도하세요.")
         
         print("비밀번호 시도 횟수 초과. 기본 설정으로 시작합니다.")
-        self.config = DEFAULT_CONFIG.copy()
+        # 틀린 키로 설정 파일을 덮어쓰지 않도록 키를 버림
+        self._set_encryption_key(None)
+        self.config = None
         return False
     
     def _initial_setup(self, provided_password=None):
@@ -127,39 +489,93 @@ class SecureStorage:
         confirm = getpass.getpass("비밀번호 확인: ")
         if password != confirm:
             print("비밀번호가 일치하지 않습니다. 기본 설정으로 시작합니다.")
-            self.config = DEFAULT_CONFIG.copy()
+            self.config = None
             return
         
-        # 암호화 키 설정 및 저장
+        # 암호화 키 설정 및 저장 (새 키는 Argon2id로 유도)
+        self._kdf_params = {
+            't': ARGON2_TIME_COST,
+            'm': ARGON2_MEMORY_COST,
+            'p': ARGON2_PARALLELISM,
+            'salt': os.urandom(SALT_SIZE)
+        }
         self._setup_encryption_key(password)
-        self._save_key_hash()
-        self._last_password = password
+        self._verify_tag = _make_verify_tag(self.encryption_key)
+        
+        # 빈 설정으로 설정 파일(헤더)을 바로 생성
+        self.config = DEFAULT_CONFIG.copy()
+        self._dirty = True
+        self.save()
+        KEY_FILE.unlink(missing_ok=True)
+        self._store_sealed_key()
         print("비밀번호가 설정되었습니다. 이 비밀번호는 설정을 암호화하는 데 사용됩니다.")
     
     def load(self):
         """암호화된 설정 파일 로드"""
         if not self.encryption_key or not CONFIG_FILE.exists():
-            return DEFAULT_CONFIG.copy()
+            self.config = DEFAULT_CONFIG.copy()
+            return self.config
         
         try:
-            with open(CONFIG_FILE, 'rb') as f:
-                encrypted_data = f.read()
-            
-            # 암호화된 데이터 구조: nonce(16바이트) + 암호문
-            nonce = encrypted_data[:16]
-            ciphertext = encrypted_data[16:]
-            
-            # AES-GCM 복호화
-            cipher = AES.new(self.encryption_key, AES.MODE_GCM, nonce=nonce)
-            decrypted_data = cipher.decrypt(ciphertext)
+            encrypted_data = self._initial_data or _read_file(CONFIG_FILE)
+            self._initial_data = None
+            decrypted_data = _decompress(self._decrypt(encrypted_data))
             
             # JSON 파싱
-            config_json = decrypted_data.decode(ENCODING)
-            self.config = json.loads(config_json)
+            self.config = _loads(decrypted_data)
+            self._last_bytes_hash = hashlib.blake2b(decrypted_data, digest_size=16).digest()
+            self._dirty = False
             return self.config
         except Exception as e:
             print(f"설정 로드 중 오류 발생: {e}")
-            return DEFAULT_CONFIG.copy()
+            self.config = DEFAULT_CONFIG.copy()
+            return self.config
+    
+    def _migrate_key_file(self):
+        """이전 형식(.key 파일 분리) 설정을 헤더 형식으로 다시 저장하고 .key 삭제"""
+        try:
+            config = _loads(_decompress(self._decrypt(_read_file(CONFIG_FILE))))
+        except Exception as e:
+            print(f"설정 변환 중 오류 발생: {e}")
+            return False
+        
+        self.config = config
+        self._verify_tag = _make_verify_tag(self.encryption_key)
+        self._legacy_key_file = False
+        self._dirty = True
+        if not self.save():
+            return False
+        KEY_FILE.unlink(missing_ok=True)
+        return True
+    
+    def _build_header(self):
+        """설정 파일 헤더 생성 (검증 태그가 현재 키와 맞지 않으면 ValueError)"""
+        verify_tag = _make_verify_tag(self.encryption_key)
+        if self._verify_tag is None or not hmac.compare_digest(verify_tag, self._verify_tag):
+            raise ValueError("암호화 키가 설정 파일의 비밀번호와 일치하지 않습니다")
+        kdf_header = _encode_kdf_header(self._kdf_params) if self._kdf_params else b''
+        return (CONFIG_MAGIC + bytes([CONFIG_VERSION, len(kdf_header)]) + kdf_header
+                + verify_tag + bytes([DEFAULT_AEAD]))
+    
+    def _decrypt(self, encrypted_data):
+        """설정 파일 복호화 (헤더가 없으면 이전 버전 형식)"""
+        # 암호화된 데이터 구조: 헤더 + nonce(12바이트) + 암호문 + 태그(16바이트), 헤더는 인증 데이터로 사용
+        header = _parse_header(encrypted_data)
+        if header is None:
+            return self._decrypt_legacy(encrypted_data)
+        
+        algorithm, header_size = header[2], header[3]
+        nonce = encrypted_data[header_size:header_size + NONCE_SIZE]
+        ciphertext = encrypted_data[header_size + NONCE_SIZE:]
+        return self._get_aead(algorithm).decrypt(nonce, ciphertext, encrypted_data[:header_size])
+    
+    def _decrypt_legacy(self, encrypted_data):
+        """이전 형식(nonce 16바이트, 인증 태그 없음) 설정 파일 복호화"""
+        nonce = encrypted_data[:LEGACY_NONCE_SIZE]
+        ciphertext = encrypted_data[LEGACY_NONCE_SIZE:]
+        # 태그가 저장되지 않았으므로 GCM 키스트림만 적용해 복호화
+        encryptor = Cipher(algorithms.AES(self.encryption_key), modes.GCM(nonce)).encryptor()
+        return encryptor.update(ciphertext)
     
     def save(self):
         """암호화하여 설정 파일 저장"""
@@ -167,22 +583,35 @@ class SecureStorage:
             print("암호화 키가 설정되지 않았습니다. 설정을 저장할 수 없습니다.")
             return False
         
+        # 변경 사항이 없으면 저장 생략
+        if not self._dirty:
+            return True
+        
         try:
-            # 설정을 JSON 문자열로 변환
-            config_json = json.dumps(self.config, ensure_ascii=False)
-            data = config_json.encode(ENCODING)
+            # 설정을 JSON bytes로 변환
+            data = _dumps(self.config)
             
-            # AES-GCM 암호화
-            cipher = AES.new(self.encryption_key, AES.MODE_GCM)
-            nonce = cipher.nonce
-            ciphertext = cipher.encrypt(data)
+            # 마지막으로 저장한 내용과 같으면 암호화/쓰기 생략
+            data_hash = hashlib.blake2b(data, digest_size=16).digest()
+            if data_hash == self._last_bytes_hash:
+                self._dirty = False
+                return True
+            
+            # AEAD 암호화 (헤더는 인증 데이터로 사용)
+            header = self._build_header()
+            nonce = os.urandom(NONCE_SIZE)
+            ciphertext = self._get_aead(DEFAULT_AEAD).encrypt(nonce, _compress(data), header)
             
-            # 암호화된 데이터 구조: nonce(16바이트) + 암호문
-            encrypted_data = nonce + ciphertext
+            # 암호화된 데이터 구조: 헤더 + nonce(12바이트) + 암호문 + 태그(16바이트)
+            encrypted_data = header + nonce + ciphertext
             
-            with open(CONFIG_FILE, 'wb') as f:
-                f.write(encrypted_data)
+            # 임시 파일에 기록 후 교체하여 쓰는 도중 중단되어도 기존 설정 유지
+            _write_file(CONFIG_TMP_FILE, encrypted_data)
+            os.replace(CONFIG_TMP_FILE, CONFIG_FILE)
             
+            self._last_bytes_hash = data_hash
+            self._initial_data = None
+            self._dirty = False
             return True
         except Exception as e:
             print(f"설정 저장 중 오류 발생: {e}")
@@ -190,7 +619,7 @@ class SecureStorage:
     
     def get(self, service, key, default=None):
         """특정 서비스/키에 대한 값 반환"""
-        if not self.config:
+        if self.config is None:
             self.load()
         
         service_config = self.config.get(service, {})
@@ -198,24 +627,57 @@ class SecureStorage:
     
     def set(self, service, key, value):
         """특정 서비스/키에 값 설정"""
-        if not self.config:
+        if self.config is None:
             self.load()
         
+        service_config = self.config.get(service, {})
+        if key in service_config and service_config[key] == value:
+            return True
+        
         if service not in self.config:
             self.config[service] = {}
         
         self.config[service][key] = value
+        self._dirty = True
+        if self._in_batch:
+            return True
         return self.save()
     
     def delete(self, service, key):
         """특정 서비스/키 삭제"""
-        if not self.config:
+        if self.config is None:
             self.load()
         
         if service in self.config and key in self.config[service]:
             del self.config[service][key]
+            self._dirty = True
+            if self._in_batch:
+                return True
             return self.save()
         return False
+    
+    def close(self):
+        """암호화 키를 메모리에서 지우기"""
+        self._wipe_key()
+    
+    def __del__(self):
+        if hasattr(self, '_aeads'):
+            self.close()
+    
+    @contextmanager
+    def batch(self):
+        """블록 안의 set/delete를 모아 종료 시 한 번만 저장"""
+        if self._in_batch:
+            yield self
+            return
+        
+        self._in_batch = True
+        try:
+            yield self
+        finally:
+            self._in_batch = False
+            if self._dirty:
+                self.save()
 
 # singleton 인스턴스로 사용
 _storage = None
@@ -225,7 +687,6 @@ def get_storage():
     global _storage
     if _storage is None:
         _storage = SecureStorage()
-        _storage.load()
     return _storage
 
 # keyring 호환 인터페이스
@@ -240,3 +701,7 @@ def set_password(service, key, value):
 def delete_password(service, key):
     """keyring.delete_password 대체 함수"""
     return get_storage().delete(service, key)
+
+def batch():
+    """여러 set_password/delete_password 호출을 한 번의 저장으로 묶음"""
+    return get_storage().batch()
@@ -1,14 +1,18 @@
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from json.decoder import JSONDecodeError
-from random import gammavariate
+from random import gammavariate, uniform
 from requests.exceptions import ConnectionError
 from termcolor import colored
 from typing import Awaitable, Callable, Optional, Union
 
 import asyncio
+import atexit
 import click
 import inquirer
+import json
 from . import secure_storage as keyring
+import sys
 import telegram
 import time
 import re
@@ -52,6 +56,9 @@ STATIONS = {
     ]
 }
 
+# 직접 입력한 역이 기본 역 목록에 있는지 확인용
+STATION_SETS = {rt: frozenset(v) for rt, v in STATIONS.items()}
+
 # --- 변경된 부분 ---
 # 출발역/도착역을 각각 따로 기본값으로 갖게끔 수정
 DEFAULT_STATIONS = {
@@ -66,16 +73,88 @@ DEFAULT_STATIONS = {
 }
 # --- 여기까지 ---
 
+# 승객 유형별 클래스
+PASSENGER_CLASSES = {
+    "SRT": {
+        "adult": Adult,
+        "child": Child,
+        "senior": Senior,
+        "disability1to3": Disability1To3,
+        "disability4to6": Disability4To6
+    },
+    "KTX": {
+        "adult": AdultPassenger,
+        "child": ChildPassenger,
+        "senior": SeniorPassenger,
+        "disability1to3": Disability1To3Passenger,
+        "disability4to6": Disability4To6Passenger
+    }
+}
+
+# 추가 승객 유형 (예매 옵션에서 켠 유형만 물어봄)
+PASSENGER_LABELS = {
+    "child": "어린이",
+    "senior": "경로우대",
+    "disability1to3": "1~3급 장애인",
+    "disability4to6": "4~6급 장애인"
+}
+
 # 예약 간격 (평균 간격 (초) = SHAPE * SCALE)
 RESERVE_INTERVAL_SHAPE = 4
 RESERVE_INTERVAL_SCALE = 0.25
 RESERVE_INTERVAL_MIN = 0.5
 
+# 서버 오류/과부하 시 재시도 간격 (평소 간격 * 2^연속 오류 횟수, 상한 (초))
+RESERVE_BACKOFF_MAX = 30
+RESERVE_BACKOFF_JITTER = 0.5
+RESERVE_BACKOFF_MAX_FAILS = 16
+
 WAITING_BAR = ["|", "/", "-", "\\"]
 
+# 출발 시각 선택지
+TIME_CHOICES = [(f"{h:02d}", f"{h:02d}0000") for h in range(24)]
+
+# 예매 기본값 키 (이전 버전은 키별로 따로 저장)
+DEFAULT_KEYS = (
+    "departure", "arrival", "date", "time",
+    "adult", "child", "senior", "disability1to3", "disability4to6"
+)
+
+# 열차 목록에서 예약 가능 표시를 초록색으로 강조
+_GREEN_OK = colored('가능', "green")
+_TRAIN_SUB = re.compile('예약가능|가능|신청하기')
+
+# 직접 입력한 역 이름 검증용 (한글 포함 여부)
+HANGUL_RE = re.compile('[가-힣]')
+
+# 좌석 유형별 확인 메서드 (None: 전체 잔여석 확인 결과 그대로 사용)
+_SEAT_AVAILABLE = {
+    (True, SeatType.GENERAL_FIRST): None,
+    (True, SeatType.SPECIAL_FIRST): None,
+    (True, SeatType.GENERAL_ONLY): "general_seat_available",
+    (True, SeatType.SPECIAL_ONLY): "special_seat_available",
+    (False, ReserveOption.GENERAL_FIRST): None,
+    (False, ReserveOption.SPECIAL_FIRST): None,
+    (False, ReserveOption.GENERAL_ONLY): "has_general_seat",
+    (False, ReserveOption.SPECIAL_ONLY): "has_special_seat",
+}
+# 열차별 (잔여석 확인, 예약대기 확인) 메서드
+_SEAT_FALLBACK = {
+    True: ("seat_available", "reserve_standby_available"),
+    False: ("has_seat", "has_waiting_list"),
+}
+
 RailType = Union[str, None]
 ChoiceType = Union[int, None]
 
+# 텔레그램 알림용 이벤트 루프와 Bot (알림마다 새로 만들지 않고 재사용)
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_tg_bot: Optional[telegram.Bot] = None
+_tg_token: Optional[str] = None
+
+# 연속 오류 횟수 (정상 응답 시 초기화)
+_backoff_state = {"fails": 0}
+
 
 @click.command()
 @click.option("--debug", is_flag=True, help="Debug mode")
@@ -150,12 +229,12 @@ def set_station(rail_type: RailType) -> bool:
 
     # 문자열 -> 리스트
     if current_departure.strip():
-        dep_list = [s.strip() for s in current_departure.split(',')]
+        dep_list = list(_split_csv(current_departure))
     else:
         dep_list = DEFAULT_STATIONS[rail_type]["departure"]
 
     if current_arrival.strip():
-        arr_list = [s.strip() for s in current_arrival.split(',')]
+        arr_list = list(_split_csv(current_arrival))
     else:
         arr_list = DEFAULT_STATIONS[rail_type]["arrival"]
 
@@ -188,8 +267,9 @@ def set_station(rail_type: RailType) -> bool:
     selected_dep = ','.join(dep_answer["dep_stations"])
     selected_arr = ','.join(arr_answer["arr_stations"])
 
-    keyring.set_password(rail_type, "departure_stations", selected_dep)
-    keyring.set_password(rail_type, "arrival_stations", selected_arr)
+    with keyring.batch():
+        keyring.set_password(rail_type, "departure_stations", selected_dep)
+        keyring.set_password(rail_type, "arrival_stations", selected_arr)
 
     print(f"[{rail_type}] 설정된 출발역: {selected_dep}")
     print(f"[{rail_type}] 설정된 도착역: {selected_arr}")
@@ -235,39 +315,50 @@ def edit_station(rail_type: RailType) -> bool:
         return False
 
     # 콤마 구분 -> 리스트
-    dep_list = [s.strip() for s in dep_input.split(',')]
-    arr_list = [s.strip() for s in arr_input.split(',')]
+    dep_list = list(_split_csv(dep_input))
+    arr_list = list(_split_csv(arr_input))
 
     # 간단하게 한글 역명인지 확인
-    hangul = re.compile('[가-힣]+')
-
     for station in dep_list:
-        if not hangul.search(station):
+        if not HANGUL_RE.search(station):
             print(f"'{station}'(출발역)은 잘못된 입력입니다. 기본 설정으로 복귀합니다.")
             dep_list = DEFAULT_STATIONS[rail_type]["departure"]
             break
 
     for station in arr_list:
-        if not hangul.search(station):
+        if not HANGUL_RE.search(station):
             print(f"'{station}'(도착역)은 잘못된 입력입니다. 기본 설정으로 복귀합니다.")
             arr_list = DEFAULT_STATIONS[rail_type]["arrival"]
             break
 
+    # 목록에 없는 역도 저장은 하되, 오타일 수 있으므로 알려줌
+    known = STATION_SETS[rail_type]
+    unknown = [station for station in dict.fromkeys(dep_list + arr_list) if station not in known]
+    if unknown:
+        print(f"'{', '.join(unknown)}'은(는) {rail_type} 역 목록에 없습니다. 역 이름을 확인하세요.")
+
     # 다시 콤마 문자열로 합쳐서 저장
     selected_dep = ','.join(dep_list)
     selected_arr = ','.join(arr_list)
 
-    keyring.set_password(rail_type, "departure_stations", selected_dep)
-    keyring.set_password(rail_type, "arrival_stations", selected_arr)
+    with keyring.batch():
+        keyring.set_password(rail_type, "departure_stations", selected_dep)
+        keyring.set_password(rail_type, "arrival_stations", selected_arr)
 
     print(f"[{rail_type}] 설정된 출발역: {selected_dep}")
     print(f"[{rail_type}] 설정된 도착역: {selected_arr}")
     return True
 # --- 여기까지 수정 ---
 
+@lru_cache(maxsize=64)
+def _split_csv(text: str) -> tuple:
+    # 콤마로 구분된 설정값 -> 앞뒤 공백을 뗀 튜플
+    return tuple(map(str.strip, text.split(',')))
+
+
 def get_options():
     options = keyring.get_password("SRT", "options") or ""
-    return options.split(',') if options else []
+    return list(_split_csv(options)) if options else []
 
 def set_options():
     default_options = get_options()
@@ -306,11 +397,12 @@ def set_telegram() -> bool:
     token, chat_id = telegram_info["token"], telegram_info["chat_id"]
 
     try:
-        keyring.set_password("telegram", "ok", "1")
-        keyring.set_password("telegram", "token", token)
-        keyring.set_password("telegram", "chat_id", chat_id)
+        with keyring.batch():
+            keyring.set_password("telegram", "ok", "1")
+            keyring.set_password("telegram", "token", token)
+            keyring.set_password("telegram", "chat_id", chat_id)
         tgprintf = get_telegram()
-        asyncio.run(tgprintf("[SRTGO] 텔레그램 설정 완료"))
+        _run_async(tgprintf("[SRTGO] 텔레그램 설정 완료"))
         return True
     except Exception as err:
         print(err)
@@ -323,12 +415,41 @@ def get_telegram() -> Optional[Callable[[str], Awaitable[None]]]:
 
     async def tgprintf(text):
         if token and chat_id:
-            bot = telegram.Bot(token=token)
-            async with bot:
-                await bot.send_message(chat_id=chat_id, text=text)
+            bot = await _get_bot(token)
+            await bot.send_message(chat_id=chat_id, text=text)
 
     return tgprintf
 
+async def _get_bot(token: str) -> telegram.Bot:
+    global _tg_bot, _tg_token
+    if _tg_bot is None or _tg_token != token:
+        if _tg_bot is not None:
+            await _tg_bot.shutdown()
+            _tg_bot = None
+        bot = telegram.Bot(token=token)
+        await bot.initialize()
+        _tg_bot, _tg_token = bot, token
+    return _tg_bot
+
+def _run_async(coro):
+    global _event_loop
+    if _event_loop is None:
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop.run_until_complete(coro)
+
+@atexit.register
+def _close_event_loop():
+    global _tg_bot
+    if _event_loop is None:
+        return
+    if _tg_bot is not None:
+        try:
+            _event_loop.run_until_complete(_tg_bot.shutdown())
+        except Exception:
+            pass
+        _tg_bot = None
+    _event_loop.close()
+
 def set_card() -> None:
     """
     카드 정보를 입력받아 keyring 에 저장한다.
@@ -366,9 +487,10 @@ def set_card() -> None:
         )
     ])
     if card_info:
-        for key, value in card_info.items():
-            keyring.set_password("card", key, value)
-        keyring.set_password("card", "ok", "1")
+        with keyring.batch():
+            for key, value in card_info.items():
+                keyring.set_password("card", key, value)
+            keyring.set_password("card", "ok", "1")
 
 
 def pay_card(rail, reservation) -> bool:
@@ -421,9 +543,10 @@ def set_login(rail_type="SRT", debug=False):
         else:
             Korail(login_info["id"], login_info["pass"], verbose=debug)
 
-        keyring.set_password(rail_type, "id", login_info["id"])
-        keyring.set_password(rail_type, "pass", login_info["pass"])
-        keyring.set_password(rail_type, "ok", "1")
+        with keyring.batch():
+            keyring.set_password(rail_type, "id", login_info["id"])
+            keyring.set_password(rail_type, "pass", login_info["pass"])
+            keyring.set_password(rail_type, "ok", "1")
         return True
     except SRTError as err:
         print(err)
@@ -431,17 +554,36 @@ def set_login(rail_type="SRT", debug=False):
         return False
 
 def login(rail_type="SRT", debug=False):
-    if keyring.get_password(rail_type, "id") is None or keyring.get_password(rail_type, "pass") is None:
-        set_login(rail_type)
-
     user_id = keyring.get_password(rail_type, "id")
     password = keyring.get_password(rail_type, "pass")
 
+    if user_id is None or password is None:
+        set_login(rail_type)
+        user_id = keyring.get_password(rail_type, "id")
+        password = keyring.get_password(rail_type, "pass")
+
     if rail_type == "SRT":
         return SRT(user_id, password, verbose=debug)
     else:
         return Korail(user_id, password, verbose=debug)
 
+def _load_defaults(rail_type: str) -> dict:
+    """
+    예매 기본값을 한 번에 불러온다.
+    "defaults_json" 키에 저장된 값을 우선 사용하고, 없으면 이전 버전의 키별 값을 읽는다.
+    """
+    saved = keyring.get_password(rail_type, "defaults_json")
+    if saved:
+        try:
+            return json.loads(saved)
+        except JSONDecodeError:
+            pass
+    return {
+        key: value for key in DEFAULT_KEYS
+        if (value := keyring.get_password(rail_type, key))
+    }
+
+
 def reserve(rail_type="SRT", debug=False):
     rail = login(rail_type, debug=debug)
     is_srt = (rail_type == "SRT")
@@ -451,14 +593,15 @@ def reserve(rail_type="SRT", debug=False):
     this_time = now.strftime("%H%M%S")
 
     # 기본값
+    saved = _load_defaults(rail_type)
     defaults = {
-        "date": keyring.get_password(rail_type, "date") or today,
-        "time": keyring.get_password(rail_type, "time") or "120000",
-        "adult": int(keyring.get_password(rail_type, "adult") or 1),
-        "child": int(keyring.get_password(rail_type, "child") or 0),
-        "senior": int(keyring.get_password(rail_type, "senior") or 0),
-        "disability1to3": int(keyring.get_password(rail_type, "disability1to3") or 0),
-        "disability4to6": int(keyring.get_password(rail_type, "disability4to6") or 0)
+        "date": saved.get("date") or today,
+        "time": saved.get("time") or "120000",
+        "adult": int(saved.get("adult") or 1),
+        "child": int(saved.get("child") or 0),
+        "senior": int(saved.get("senior") or 0),
+        "disability1to3": int(saved.get("disability1to3") or 0),
+        "disability4to6": int(saved.get("disability4to6") or 0)
     }
 
     # --- 변경된 부분 ---
@@ -467,18 +610,18 @@ def reserve(rail_type="SRT", debug=False):
     saved_arr = keyring.get_password(rail_type, "arrival_stations") or ""
 
     if saved_dep.strip():
-        dep_list = [s.strip() for s in saved_dep.split(',')]
+        dep_list = list(_split_csv(saved_dep))
     else:
         dep_list = DEFAULT_STATIONS[rail_type]["departure"]
 
     if saved_arr.strip():
-        arr_list = [s.strip() for s in saved_arr.split(',')]
+        arr_list = list(_split_csv(saved_arr))
     else:
         arr_list = DEFAULT_STATIONS[rail_type]["arrival"]
 
     # 출발역/도착역 기본 선택값이 없으면 첫 번째 값 사용
-    defaults["departure"] = keyring.get_password(rail_type, "departure") or (dep_list[0] if dep_list else "")
-    defaults["arrival"] = keyring.get_password(rail_type, "arrival") or (arr_list[0] if arr_list else "")
+    defaults["departure"] = saved.get("departure") or (dep_list[0] if dep_list else "")
+    defaults["arrival"] = saved.get("arrival") or (arr_list[0] if arr_list else "")
     # --- 여기까지 ---
 
     # 출발역과 도착역이 같으면 기본값 보정
@@ -491,12 +634,10 @@ def reserve(rail_type="SRT", debug=False):
     options = get_options()
 
     # 날짜/시간 선택지
+    base = now.date()
     date_choices = [
-        ((now + timedelta(days=i)).strftime("%Y/%m/%d %a"),
-         (now + timedelta(days=i)).strftime("%Y%m%d")) for i in range(28)
-    ]
-    time_choices = [
-        (f"{h:02d}", f"{h:02d}0000") for h in range(24)
+        (d.strftime("%Y/%m/%d %a"), d.strftime("%Y%m%d"))
+        for i in range(28) if (d := base + timedelta(days=i))
     ]
 
     # 예약에 필요한 질문 구성
@@ -509,27 +650,15 @@ def reserve(rail_type="SRT", debug=False):
         inquirer.List("date", message="출발 날짜 선택 (↕:이동, Enter: 선택)",
                       choices=date_choices, default=defaults["date"]),
         inquirer.List("time", message="출발 시각 선택 (↕:이동, Enter: 선택)",
-                      choices=time_choices, default=defaults["time"]),
+                      choices=TIME_CHOICES, default=defaults["time"]),
         inquirer.List("adult", message="성인 승객수 (↕:이동, Enter: 선택)",
                       choices=range(10), default=defaults["adult"]),
     ]
 
     # 추가 승객 옵션
-    passenger_types = {
-        "child": "어린이",
-        "senior": "경로우대",
-        "disability1to3": "1~3급 장애인",
-        "disability4to6": "4~6급 장애인"
-    }
-    passenger_classes = {
-        "adult": Adult if is_srt else AdultPassenger,
-        "child": Child if is_srt else ChildPassenger,
-        "senior": Senior if is_srt else SeniorPassenger,
-        "disability1to3": Disability1To3 if is_srt else Disability1To3Passenger,
-        "disability4to6": Disability4To6 if is_srt else Disability4To6Passenger
-    }
+    passenger_classes = PASSENGER_CLASSES[rail_type]
 
-    for key, label in passenger_types.items():
+    for key, label in PASSENGER_LABELS.items():
         if key in options:  # 옵션 활성화된 타입만 물어봄
             q_info.append(inquirer.List(
                 key,
@@ -550,8 +679,8 @@ def reserve(rail_type="SRT", debug=False):
         return
 
     # 사용자 입력값을 keyring에 저장(다음에 기본으로 불러올 수 있음)
-    for key, value in info.items():
-        keyring.set_password(rail_type, key, str(value))
+    saved.update((key, str(value)) for key, value in info.items())
+    keyring.set_password(rail_type, "defaults_json", json.dumps(saved, ensure_ascii=False))
 
     # 출발 날짜/시간 체크
     if info["date"] == today and int(info["time"]) < int(this_time):
@@ -561,19 +690,12 @@ def reserve(rail_type="SRT", debug=False):
     passengers = []
     total_count = 0
 
-    # 어른/청소년부터(기본)
-    adult_count = info["adult"] if isinstance(info["adult"], int) else int(info["adult"])
-    if adult_count > 0:
-        passengers.append(passenger_classes["adult"](adult_count))
-        total_count += adult_count
-
-    # 추가 승객(어린이/경로/장애인)
-    for k in ["child", "senior", "disability1to3", "disability4to6"]:
-        if k in info and info[k] > 0:
-            count = info[k] if isinstance(info[k], int) else int(info[k])
-            if count > 0:
-                passengers.append(passenger_classes[k](count))
-                total_count += count
+    # 어른/청소년(기본) + 추가 승객(어린이/경로/장애인)
+    for k in passenger_classes:
+        count = int(info.get(k) or 0)
+        if count > 0:
+            passengers.append(passenger_classes[k](count))
+            total_count += count
 
     if total_count == 0:
         print(colored("승객수는 0이 될 수 없습니다", "green", "on_red") + "\n")
@@ -600,13 +722,9 @@ def reserve(rail_type="SRT", debug=False):
         if "ktx" in options:
             params["train_type"] = TrainType.KTX
 
-    trains = rail.search_train(**params)
-
-    def train_decorator(train):
-        msg = train.__repr__()
-        return (msg.replace('예약가능', colored('가능', "green"))
-                .replace('가능', colored('가능', "green"))
-                .replace('신청하기', colored('가능', "green")))
+    # 조회 인자는 바뀌지 않으므로 한 번만 묶어 둔다 (재로그인 시 다시 묶음)
+    search = partial(rail.search_train, **params)
+    trains = search()
 
     if not trains:
         print(colored("예약 가능한 열차가 없습니다", "green", "on_red") + "\n")
@@ -616,7 +734,7 @@ def reserve(rail_type="SRT", debug=False):
         inquirer.Checkbox(
             "trains",
             message="예약할 열차 선택 (↕:이동, Space: 선택, Enter: 완료, Ctrl-A: 전체선택, Ctrl-R: 선택해제)",
-            choices=[(train_decorator(train), i) for i, train in enumerate(trains)]
+            choices=[(_train_label(repr(train)), i) for i, train in enumerate(trains)]
         )
     ]
 
@@ -659,30 +777,37 @@ def reserve(rail_type="SRT", debug=False):
                 msg += "\n결제 완료"
 
         tgprintf = get_telegram()
-        asyncio.run(tgprintf(msg))
+        _run_async(tgprintf(msg))
 
+    selected = choice["trains"]
+    wanted_seat = options_ans["type"]
     i_try = 0
+    _backoff_state["fails"] = 0  # 이전 예매에서 남은 연속 오류 횟수 초기화
     start_time = time.time()
+    last_sec, last_hms = -1, ""
     while True:
         try:
             i_try += 1
-            elapsed_time = time.time() - start_time
-            hours, remainder = divmod(int(elapsed_time), 3600)
-            minutes, seconds = divmod(remainder, 60)
-            print(
-                f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} "
-                f"({hours:02d}:{minutes:02d}:{seconds:02d}) ",
-                end="", flush=True
-            )
-            trains = rail.search_train(**params)
-            for i in choice["trains"]:
-                if _is_seat_available(trains[i], options_ans["type"], rail_type):
-                    _reserve(trains[i])
+            # 경과 시간 문자열은 초가 바뀔 때만 다시 만든다
+            sec = int(time.time() - start_time)
+            if sec != last_sec:
+                last_sec = sec
+                last_hms = f"{sec // 3600:02d}:{sec // 60 % 60:02d}:{sec % 60:02d}"
+            sys.stdout.write(f"\r예매 대기 중... {WAITING_BAR[i_try & 3]} {i_try:4d} ({last_hms}) ")
+            sys.stdout.flush()
+            trains = search()
+            for i in selected:
+                train = trains[i]
+                if _is_seat_available(train, wanted_seat, is_srt):
+                    _reserve(train)
                     return
             _sleep()
 
         except SRTError as ex:
             msg = ex.msg
+            sold_out = any(err in msg for err in (
+                "잔여석없음", "예약대기 접수가 마감되었습니다", "예약대기자한도수초과"
+            ))
             if "정상적인 경로로 접근 부탁드립니다" in msg:
                 if debug:
                     print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}")
@@ -691,36 +816,39 @@ def reserve(rail_type="SRT", debug=False):
                 if debug:
                     print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {msg}")
                 rail = login(rail_type, debug=debug)
+                search = partial(rail.search_train, **params)
                 if not rail.is_login and not _handle_error(ex):
                     return
-            elif not any(err in msg for err in (
-                "잔여석없음", "사용자가 많아 접속이 원활하지 않습니다",
-                "예약대기 접수가 마감되었습니다", "예약대기자한도수초과"
-            )):
+            elif not sold_out and "사용자가 많아 접속이 원활하지 않습니다" not in msg:
                 if not _handle_error(ex):
                     return
-            _sleep()
+            # 매진 응답만 평소 간격으로, 과부하/비정상 접근/예상치 못한 오류는 백오프
+            _sleep(err=not sold_out)
 
         except KorailError as ex:
             benign_msgs = ("Sold out", "잔여석없음", "예약대기자한도수초과", "예약대기불가 열차종별")
             # 예약대기 불가 열차 등은 단순히 다시 시도
-            if not any(msg in str(ex) for msg in benign_msgs):
+            if any(msg in str(ex) for msg in benign_msgs):
+                _sleep()
+            else:
                 if not _handle_error(ex):
                     return
-            _sleep()
+                _sleep(err=True)
 
         except JSONDecodeError as ex:
             if debug:
                 print(f"\nException: {ex}\nType: {type(ex)}\nArgs: {ex.args}\nMessage: {ex.msg}")
-            _sleep()
+            _sleep(err=True)
             rail = login(rail_type, debug=debug)
+            search = partial(rail.search_train, **params)
 
         except ConnectionError as ex:
             # 연결 끊김은 메시지만 남기고 무한 재시도
             if debug:
                 print("연결이 끊겼습니다. 다시 시도합니다.")
-            _sleep()
+            _sleep(err=True)
             rail = login(rail_type, debug=debug)
+            search = partial(rail.search_train, **params)
 
         except Exception as ex:
             if debug:
@@ -728,65 +856,66 @@ def reserve(rail_type="SRT", debug=False):
             if not _handle_error(ex):
                 return
             rail = login(rail_type, debug=debug)
+            search = partial(rail.search_train, **params)
 
-def _sleep():
-    time.sleep(gammavariate(RESERVE_INTERVAL_SHAPE, RESERVE_INTERVAL_SCALE) + RESERVE_INTERVAL_MIN)
+@lru_cache(maxsize=256)
+def _train_label(text: str) -> str:
+    # 같은 열차 정보는 다시 꾸미지 않고 재사용
+    return _TRAIN_SUB.sub(_GREEN_OK, text)
+
+
+def _sleep(err=False):
+    delay = gammavariate(RESERVE_INTERVAL_SHAPE, RESERVE_INTERVAL_SCALE) + RESERVE_INTERVAL_MIN
+    if err:
+        # 연속 오류마다 평소 간격의 두 배씩 늘림 (첫 오류부터 평소보다 길게, 상한 + 지터)
+        fails = _backoff_state["fails"] + 1
+        delay = min(RESERVE_BACKOFF_MAX, delay * 2 ** fails) + uniform(0, RESERVE_BACKOFF_JITTER)
+        _backoff_state["fails"] = min(fails, RESERVE_BACKOFF_MAX_FAILS)
+    else:
+        _backoff_state["fails"] = 0
+    time.sleep(delay)
 
 def _handle_error(ex, msg=None):
     msg = msg or f"\nException: {ex}, Type: {type(ex)}, Message: {ex.args}"
     print(msg)
     tgprintf = get_telegram()
-    asyncio.run(tgprintf(msg))
+    _run_async(tgprintf(msg))
     return inquirer.confirm(message="계속할까요", default=True)
 
-def _is_seat_available(train, seat_type, rail_type):
-    if rail_type == "SRT":
-        if not train.seat_available():
-            return train.reserve_standby_available()
-        if seat_type in [SeatType.GENERAL_FIRST, SeatType.SPECIAL_FIRST]:
-            return train.seat_available()
-        if seat_type == SeatType.GENERAL_ONLY:
-            return train.general_seat_available()
-        return train.special_seat_available()
-    else:
-        if not train.has_seat():
-            return train.has_waiting_list()
-        if seat_type in [ReserveOption.GENERAL_FIRST, ReserveOption.SPECIAL_FIRST]:
-            return train.has_seat()
-        if seat_type == ReserveOption.GENERAL_ONLY:
-            return train.has_general_seat()
-        return train.has_special_seat()
+def _is_seat_available(train, seat_type, is_srt):
+    has_seat, has_waiting = _SEAT_FALLBACK[is_srt]
+    available = getattr(train, has_seat)()
+    if not available:
+        return getattr(train, has_waiting)()
+    check = _SEAT_AVAILABLE[is_srt, seat_type]
+    if check is None:
+        return available
+    return getattr(train, check)()
 
 def check_reservation(rail_type="SRT", debug=False):
     rail = login(rail_type, debug=debug)
 
-    while True:
-        if rail_type == "SRT":
-            reservations = rail.get_reservations()
-            tickets = []
-        else:
-            reservations = rail.reservations()
-            tickets = rail.tickets()
-
-        all_reservations = []
-        for t in tickets:
-            t.is_ticket = True
-            all_reservations.append(t)
-        for r in reservations:
-            if hasattr(r, "paid") and r.paid:
-                r.is_ticket = True
-            else:
-                r.is_ticket = False
-            all_reservations.append(r)
+    # 취소/환불하면 바로 끝나므로 내역은 한 번만 불러온다
+    if rail_type == "SRT":
+        reservations = rail.get_reservations()
+        tickets = []
+    else:
+        reservations = rail.reservations()
+        tickets = rail.tickets()
 
-        if not reservations and not tickets:
-            print(colored("예약 내역이 없습니다", "green", "on_red") + "\n")
-            return
+    if not reservations and not tickets:
+        print(colored("예약 내역이 없습니다", "green", "on_red") + "\n")
+        return
 
-        cancel_choices = [
-            (str(reservation), i) for i, reservation in enumerate(all_reservations)
-        ] + [("텔레그램으로 예매 정보 전송", -2), ("돌아가기", -1)]
+    # (예약, 발권 여부)
+    all_reservations = [(t, True) for t in tickets] + [
+        (r, bool(getattr(r, "paid", False))) for r in reservations
+    ]
+    cancel_choices = [
+        (str(reservation), i) for i, (reservation, _) in enumerate(all_reservations)
+    ] + [("텔레그램으로 예매 정보 전송", -2), ("돌아가기", -1)]
 
+    while True:
         cancel = inquirer.list_input(
             message="예약 취소 (Enter: 결정)",
             choices=cancel_choices
@@ -799,22 +928,23 @@ def check_reservation(rail_type="SRT", debug=False):
             out = []
             if all_reservations:
                 out.append("[ 예매 내역 ]")
-                for reservation in all_reservations:
+                for reservation, _ in all_reservations:
                     out.append(f"🚅{reservation}")
                     if rail_type == "SRT":
                         out.extend(map(str, reservation.tickets))
 
             if out:
                 tgprintf = get_telegram()
-                asyncio.run(tgprintf("\n".join(out)))
+                _run_async(tgprintf("\n".join(out)))
             return
 
         if inquirer.confirm(message=colored("정말 취소하시겠습니까", "green", "on_red")):
+            reservation, is_ticket = all_reservations[cancel]
             try:
-                if all_reservations[cancel].is_ticket:
-                    rail.refund(all_reservations[cancel])
+                if is_ticket:
+                    rail.refund(reservation)
                 else:
-                    rail.cancel(all_reservations[cancel])
+                    rail.cancel(reservation)
             except Exception as err:
                 raise err
             return